@@ -22,11 +22,15 @@ Environment:
 
 import argparse
 import asyncio
+import itertools
 import json
 import os
+import string
 import sys
 import time
-from typing import Optional
+import uuid
+from collections import defaultdict
+from typing import Callable, Optional
 
 # --- CDP-level operations (minimal deps: httpx + websockets) ---
 
@@ -38,6 +42,31 @@ except ImportError:
     print("  pip3 install httpx websockets")
     sys.exit(1)
 
+try:
+    import uvloop  # optional: faster event loop (POSIX only)
+except ImportError:
+    uvloop = None
+
+try:
+    import orjson  # optional: faster JSON for CDP framing and HTTP bodies
+except ImportError:
+    orjson = None
+
+
+def json_dumps(obj, indent: bool = False) -> bytes:
+    """Serialize to UTF-8 JSON bytes (orjson when available)."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, default=str, indent=2 if indent else None).encode()
+
+
+def json_loads(data):
+    """Parse JSON from str or bytes (orjson when available)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
 CDP_BASE = os.environ.get("CDP_URL", f"http://localhost:{os.environ.get('CDP_PORT', '18800')}")
 
 
@@ -45,50 +74,346 @@ CDP_BASE = os.environ.get("CDP_URL", f"http://localhost:{os.environ.get('CDP_POR
 # Low-level CDP operations (no browser-use dependency needed)
 # ============================================================
 
-async def get_targets():
-    """List all CDP targets (tabs)."""
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(f"{CDP_BASE}/json")
-        return resp.json()
+TARGETS_TTL = 2.0  # seconds a /json tab list is reused
 
+_HTTP: Optional[httpx.AsyncClient] = None
 
-async def get_ws_url(tab_url_filter: Optional[str] = None) -> tuple[str, str]:
-    """Get CDP websocket URL for a tab."""
-    targets = await get_targets()
+
+def get_http() -> httpx.AsyncClient:
+    """Shared keep-alive client for the CDP HTTP endpoint, created on first use."""
+    global _HTTP
+    if _HTTP is None:
+        _HTTP = httpx.AsyncClient(base_url=CDP_BASE, timeout=2.0,
+                                  limits=httpx.Limits(max_keepalive_connections=4))
+    return _HTTP
+
+
+async def close_http():
+    global _HTTP
+    if _HTTP is not None:
+        await _HTTP.aclose()
+        _HTTP = None
+
+
+_targets_cache: Optional[tuple[float, list]] = None
+
+
+async def get_targets(fresh: bool = False):
+    """List all CDP targets (tabs). Served from a short TTL cache unless fresh."""
+    global _targets_cache
+    now = time.monotonic()
+    if not fresh and _targets_cache and now - _targets_cache[0] < TARGETS_TTL:
+        return _targets_cache[1]
+    resp = await get_http().get("/json")
+    targets = resp.json()
+    _targets_cache = (now, targets)
+    return targets
+
+
+def invalidate_targets():
+    """Drop the cached tab list (tab opened/closed, or a stale entry failed)."""
+    global _targets_cache
+    _targets_cache = None
+
+
+def _match_target(targets: list, tab_url_filter: Optional[str], target_id: Optional[str] = None) -> dict:
     pages = [t for t in targets if t.get("type") == "page"]
 
+    if target_id:
+        for t in pages:
+            if t.get("id") == target_id:
+                return t
+        raise RuntimeError(f"No tab with target id '{target_id}'")
     if tab_url_filter:
         matching = [t for t in pages if tab_url_filter.lower() in t.get("url", "").lower()]
         if not matching:
             urls = [t.get("url") for t in pages]
             raise RuntimeError(f"No tab matching '{tab_url_filter}'. Available: {urls}")
-        target = matching[0]
-    else:
-        if not pages:
-            raise RuntimeError("No page targets found")
-        target = pages[0]
+        return matching[0]
+    if not pages:
+        raise RuntimeError("No page targets found")
+    return pages[0]
 
+
+async def find_target(tab_url_filter: Optional[str] = None, target_id: Optional[str] = None) -> dict:
+    """Find a page target by id, by URL substring, or the first page."""
+    try:
+        return _match_target(await get_targets(), tab_url_filter, target_id)
+    except RuntimeError:
+        # The cached list may predate a new tab or navigation: retry once, fresh
+        invalidate_targets()
+        return _match_target(await get_targets(fresh=True), tab_url_filter, target_id)
+
+
+async def get_ws_url(tab_url_filter: Optional[str] = None,
+                     target_id: Optional[str] = None) -> tuple[str, str, str]:
+    """Get (webSocketDebuggerUrl, url, target id) for a tab."""
+    target = await find_target(tab_url_filter, target_id)
     ws_url = target.get("webSocketDebuggerUrl")
     if not ws_url:
         raise RuntimeError(f"No webSocketDebuggerUrl for {target.get('url')}")
-    return ws_url, target.get("url", "unknown")
+    return ws_url, target.get("url", "unknown"), target.get("id")
+
+
+WS_MAX_SIZE = 100 * 1024 * 1024
+PING_TIMEOUT = 2.0
+RESOLVE_TTL = 5.0  # seconds a tab_url -> target mapping is trusted without re-polling /json
+CONNECT_ATTEMPTS = 4
+
+# Events after which a cached DOM.getDocument result no longer matches the page.
+# Mutations are reported for every node already sent to us, i.e. everything in
+# a cached tree; SPA route changes fire navigatedWithinDocument, not frameNavigated.
+DOM_CHANGE_EVENTS = (
+    "DOM.documentUpdated", "DOM.childNodeInserted", "DOM.childNodeRemoved",
+    "DOM.childNodeCountUpdated", "DOM.attributeModified", "DOM.attributeRemoved",
+    "DOM.characterDataModified", "DOM.shadowRootPushed", "DOM.shadowRootPopped",
+    "Page.navigatedWithinDocument",
+)
+
+
+class CDPSession:
+    """Multiplexes CDP commands and events over one websocket.
+
+    A single background reader routes each reply to the Future registered
+    under its id (so several commands can be in flight at once) and each
+    event to the callbacks subscribed with on().
+    """
+
+    def __init__(self, ws, target_id: str = None, url: str = "unknown"):
+        self.ws = ws
+        self._next_id = itertools.count(1)  # ids only need to be unique per connection
+        self.target_id = target_id
+        self.url = url
+        self.navigations = 0  # bumped on every main-frame navigation (needs Page.enable)
+        self.dom_cache: dict[tuple[int, bool], dict] = {}  # (depth, pierce) -> latest DOM.getDocument only
+        self.editor: Optional[str] = None  # detected EDITOR_PROFILES key, until the page navigates
+        self.enabled_domains: set[str] = set()  # survives navigation; see cdp_enable()
+        self.document_object: Optional[str] = None  # Runtime objectId of document, until the page navigates
+        self._pending: dict[int, asyncio.Future] = {}
+        self._events: dict[str, list[Callable[[dict], None]]] = {}
+        self.on("Page.frameNavigated", self._on_frame_navigated)
+        for method in DOM_CHANGE_EVENTS:
+            self.on(method, self._on_dom_changed)
+        self._reader = asyncio.create_task(self._read_loop())
+
+    def on(self, method: str, callback: Callable[[dict], None]):
+        """Call callback(params) for every CDP event named method."""
+        self._events.setdefault(method, []).append(callback)
+
+    async def _read_loop(self):
+        try:
+            async for raw in self.ws:
+                msg = json_loads(raw)
+                if "id" in msg:
+                    fut = self._pending.pop(msg["id"], None)
+                    if fut is None or fut.done():
+                        continue  # reply nobody is waiting for
+                    if "error" in msg:
+                        fut.set_exception(RuntimeError(f"CDP error: {msg['error']}"))
+                    else:
+                        fut.set_result(msg.get("result", {}))
+                else:
+                    self._dispatch_event(msg.get("method"), msg.get("params", {}))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            for fut in self._pending.values():
+                if not fut.done():
+                    fut.set_exception(RuntimeError("CDP connection closed"))
+            self._pending.clear()
+
+    def _dispatch_event(self, method: str, params: dict):
+        for callback in list(self._events.get(method, ())):
+            try:
+                callback(params)
+            except Exception as e:
+                # A broken subscriber must not take down the reader
+                print(f"CDP event handler for {method} failed: {e}", file=sys.stderr)
+
+    def _on_frame_navigated(self, params: dict):
+        frame = params.get("frame", {})
+        if not frame.get("parentId"):
+            self.url = frame.get("url", self.url)
+            self.navigations += 1
+            self.dom_cache.clear()
+            self.editor = None
+            self.document_object = None  # released with the old document's context
+
+    def _on_dom_changed(self, params: dict):
+        self.dom_cache.clear()  # after documentUpdated, earlier node ids are invalid too
+
+    async def is_alive(self) -> bool:
+        """Health check before reuse: reader still running and the socket answers a ping."""
+        if self._reader.done():
+            return False
+        try:
+            pong = await self.ws.ping()
+            await asyncio.wait_for(pong, PING_TIMEOUT)
+        except Exception:
+            return False
+        return True
 
+    async def close(self):
+        await self.ws.close()
+        try:
+            await self._reader
+        except Exception as e:
+            # A reader that died on a bad message must not abort pool shutdown
+            print(f"CDP reader for {self.url} failed: {e}", file=sys.stderr)
+
+    async def send(self, method: str, params: dict = None, session_id: str = None) -> asyncio.Future:
+        """Write a CDP command without waiting; returns a Future for its result."""
+        return await self.send_frame(encode_command(method, params), session_id)
+
+    async def send_frame(self, frame: str, session_id: str = None) -> asyncio.Future:
+        """Like send(), for a command already encoded by encode_command()."""
+        if self._reader.done():
+            raise RuntimeError("CDP connection closed")  # no reader left to resolve a reply
+        msg_id = next(self._next_id)
+        data = f'{frame},"id":{msg_id}'
+        if session_id:
+            data += f',"sessionId":{json_dumps(session_id).decode()}'
+        data += '}'
+        fut = asyncio.get_running_loop().create_future()
+        self._pending[msg_id] = fut
+        try:
+            await self.ws.send(data)
+        except Exception:
+            self._pending.pop(msg_id, None)
+            raise
+        return fut
 
-async def cdp_send(ws, method: str, params: dict = None, session_id: str = None) -> dict:
-    """Send CDP command and wait for response."""
-    msg_id = int(time.time() * 1000000) % 10000000
-    msg = {"id": msg_id, "method": method}
+
+def encode_command(method: str, params: dict = None) -> str:
+    """JSON-encode a command minus its closing brace; send_frame() appends the id.
+
+    Kept as str: Chrome's DevTools socket only accepts text frames.
+    """
+    msg = {"method": method}
     if params:
         msg["params"] = params
-    if session_id:
-        msg["sessionId"] = session_id
-    await ws.send(json.dumps(msg))
-    while True:
-        response = json.loads(await ws.recv())
-        if response.get("id") == msg_id:
-            if "error" in response:
-                raise RuntimeError(f"CDP error: {response['error']}")
-            return response.get("result", {})
+    return json_dumps(msg).decode()[:-1]
+
+
+async def cdp_send(session: CDPSession, method: str, params: dict = None, session_id: str = None) -> dict:
+    """Send CDP command and wait for response."""
+    fut = await session.send(method, params, session_id)
+    return await fut
+
+
+async def cdp_enable(session: CDPSession, domain: str):
+    """Send <domain>.enable once per session rather than on every call."""
+    if domain not in session.enabled_domains:
+        await cdp_send(session, f'{domain}.enable')
+        session.enabled_domains.add(domain)
+
+
+class CDPPool:
+    """Keeps one CDPSession per tab (keyed by target id) open across calls.
+
+    tab_url lookups are cached for RESOLVE_TTL seconds and dropped as soon as
+    the tab navigates, since the filter may no longer match its URL.
+    """
+
+    def __init__(self):
+        self._sessions: dict[str, CDPSession] = {}
+        self._resolved: dict[Optional[str], tuple[str, int, float]] = {}
+        self._connecting: dict[str, asyncio.Task] = {}  # target id -> in-flight _connect
+
+    async def get(self, tab_url_filter: Optional[str] = None,
+                  target_id: Optional[str] = None) -> CDPSession:
+        """Return a live session for the tab, connecting (or reconnecting) if needed.
+
+        With target_id the /json poll is skipped entirely while the pooled
+        session is healthy.
+        """
+        by_id = target_id is not None
+        session = self._sessions.get(target_id) if by_id else self._lookup(tab_url_filter)
+        if session is not None and await session.is_alive():
+            return session
+
+        ws_url, url, target_id = await get_ws_url(tab_url_filter, target_id)
+        session = self._sessions.get(target_id)
+        if session is None or not await session.is_alive():
+            session = await self._reconnect(ws_url, target_id, url, session)
+
+        if not by_id:
+            self._resolved[tab_url_filter] = (target_id, session.navigations,
+                                              time.monotonic() + RESOLVE_TTL)
+        return session
+
+    def _lookup(self, tab_url_filter: Optional[str]) -> Optional[CDPSession]:
+        entry = self._resolved.get(tab_url_filter)
+        if entry is None:
+            return None
+        target_id, navigations, expires = entry
+        session = self._sessions.get(target_id)
+        if session is None or session.navigations != navigations or time.monotonic() > expires:
+            del self._resolved[tab_url_filter]
+            return None
+        return session
+
+    async def _reconnect(self, ws_url: str, target_id: str, url: str,
+                         stale: Optional[CDPSession]) -> CDPSession:
+        """Connect to a tab at most once at a time; concurrent callers share the attempt.
+
+        Nothing is locked while the network is awaited, so a dead tab only
+        stalls callers of that tab.
+        """
+        task = self._connecting.get(target_id)
+        if task is None:
+            current = self._sessions.get(target_id)
+            if current is not stale:
+                return current  # replaced by another caller while we pinged
+            task = asyncio.create_task(self._connect(ws_url, target_id, url))
+            self._connecting[target_id] = task
+            task.add_done_callback(lambda _: self._connecting.pop(target_id, None))
+        # Shielded: one caller timing out must not cancel the others' connect
+        return await asyncio.shield(task)
+
+    async def _connect(self, ws_url: str, target_id: str, url: str) -> CDPSession:
+        """Open a websocket with exponential backoff and subscribe to navigations."""
+        delay = 0.1
+        for attempt in range(CONNECT_ATTEMPTS):
+            try:
+                ws = await websockets.connect(ws_url, max_size=WS_MAX_SIZE)
+                break
+            except (OSError, websockets.InvalidHandshake) as e:
+                if attempt == CONNECT_ATTEMPTS - 1:
+                    invalidate_targets()
+                    raise RuntimeError(f"Could not connect to {url}: {e}") from e
+                await asyncio.sleep(delay)
+                delay *= 2
+        session = CDPSession(ws, target_id, url)
+        await cdp_enable(session, 'Page')
+        self._sessions[target_id] = session
+        return session
+
+    async def close(self):
+        """Close every pooled connection."""
+        for task in list(self._connecting.values()):
+            task.cancel()
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        self._resolved.clear()
+        for session in sessions:
+            await session.close()
+
+
+POOL = CDPPool()
+
+
+async def shutdown():
+    """Stop agent jobs and close CDP sockets, the HTTP client and any browser-use session."""
+    await cancel_agent_jobs()
+    await POOL.close()
+    await close_http()
+    await browser_use_reset()
+
+
+# One operation per tab at a time, so concurrent /type or /click calls
+# against the same tab don't interleave their input events.
+PER_TAB_LOCK: dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
 
 
 # --- Keyboard input via CDP Input.dispatchKeyEvent ---
@@ -99,161 +424,400 @@ SPECIAL_KEYS = {
     '\r': ('Enter', 'Enter', 13),
 }
 
-async def dispatch_key(ws, char: str, session_id: str = None):
-    """Dispatch a single key via raw CDP events."""
+SHIFTED_SYMBOLS = '!@#$%^&*()_+{}|:"<>?~'
+
+
+def needs_key_events(char: str) -> bool:
+    """Whether a character needs the full per-key sequence (specials, Shift)."""
+    return char in SPECIAL_KEYS or char.isupper() or char in SHIFTED_SYMBOLS
+
+
+def split_runs(text: str) -> list[tuple[str, bool]]:
+    """Split text into (chunk, is_plain): maximal plain runs and single key-event characters."""
+    runs = []
+    run = ''
+    for c in text:
+        if needs_key_events(c):
+            if run:
+                runs.append((run, True))
+                run = ''
+            runs.append((c, False))
+        else:
+            run += c
+    if run:
+        runs.append((run, True))
+    return runs
+
+
+async def insert_text(session, text: str, session_id: str = None):
+    """Insert a run of plain characters with a single Input.insertText call."""
+    await cdp_send(session, 'Input.insertText', {'text': text}, session_id)
+
+
+def key_frames(char: str) -> tuple[str, str, str]:
+    """Encoded keyDown/char/keyUp commands for one character."""
     if char in SPECIAL_KEYS:
         key, code, vk = SPECIAL_KEYS[char]
+        frames = []
         for etype in ['rawKeyDown', 'char', 'keyUp']:
             params = {'type': etype, 'key': key, 'code': code,
                       'windowsVirtualKeyCode': vk, 'nativeVirtualKeyCode': vk}
             if etype == 'char':
                 params['text'] = '\r' if char == '\n' else char
-            await cdp_send(ws, 'Input.dispatchKeyEvent', params, session_id)
-        await asyncio.sleep(0.05)  # Editors need time for block creation
-    else:
-        kc = ord(char)
-        is_shifted = char.isupper() or char in '!@#$%^&*()_+{}|:"<>?~'
-        mods = 8 if is_shifted else 0  # 8 = Shift
-
-        code = ''
-        if char.isalpha():
-            code = f'Key{char.upper()}'
-        elif char.isdigit():
-            code = f'Digit{char}'
-
-        # keyDown without text (signals which key), char with text (inserts character), keyUp
-        await cdp_send(ws, 'Input.dispatchKeyEvent', {
+            frames.append(encode_command('Input.dispatchKeyEvent', params))
+        return tuple(frames)
+
+    kc = ord(char)
+    is_shifted = char.isupper() or char in SHIFTED_SYMBOLS
+    mods = 8 if is_shifted else 0  # 8 = Shift
+
+    code = ''
+    if char.isalpha():
+        code = f'Key{char.upper()}'
+    elif char.isdigit():
+        code = f'Digit{char}'
+
+    # keyDown without text (signals which key), char with text (inserts character), keyUp
+    return (
+        encode_command('Input.dispatchKeyEvent', {
             'type': 'keyDown', 'key': char, 'code': code,
             'windowsVirtualKeyCode': kc, 'nativeVirtualKeyCode': kc,
             'modifiers': mods,
-        }, session_id)
-        await cdp_send(ws, 'Input.dispatchKeyEvent', {
+        }),
+        encode_command('Input.dispatchKeyEvent', {
             'type': 'char', 'key': char, 'text': char,
             'windowsVirtualKeyCode': kc, 'nativeVirtualKeyCode': kc,
             'modifiers': mods,
-        }, session_id)
-        await cdp_send(ws, 'Input.dispatchKeyEvent', {
+        }),
+        encode_command('Input.dispatchKeyEvent', {
             'type': 'keyUp', 'key': char, 'code': code,
             'windowsVirtualKeyCode': kc, 'nativeVirtualKeyCode': kc,
             'modifiers': mods,
-        }, session_id)
-        await asyncio.sleep(0.008)
+        }),
+    )
 
 
-async def cdp_type(text: str, tab_url: Optional[str] = None,
-                   selector: Optional[str] = None, clear: bool = False):
-    """Type text using raw CDP key events. Passes isTrusted checks."""
-    ws_url, url = await get_ws_url(tab_url)
-    print(f"Connected: {url}")
+# Printable ASCII is encoded once at import; anything else is built on demand
+KEY_TABLE = {c: key_frames(c) for c in string.printable}
+
+
+async def dispatch_key(session, char: str, session_id: str = None,
+                       char_delay: float = 0, newline_delay: float = 0):
+    """Dispatch a single key via raw CDP events."""
+    frames = KEY_TABLE.get(char) or key_frames(char)
+    # All three events are written back-to-back, then every ack is collected
+    # (return_exceptions, so one failure doesn't leave the rest unretrieved)
+    futures = [await session.send_frame(f, session_id) for f in frames]
+    for result in await asyncio.gather(*futures, return_exceptions=True):
+        if isinstance(result, BaseException):
+            raise result
+    delay = newline_delay if char in SPECIAL_KEYS else char_delay
+    if delay:
+        await asyncio.sleep(delay)
+
+
+# Pacing per editor. React-based editors (DraftJS, Slate) commit state
+# asynchronously and need a beat between keys and after Enter for block
+# creation; everything else gets no artificial delay.
+EDITOR_PROFILES = {
+    'fast': {'char_delay': 0, 'newline_delay': 0},
+    'draftjs': {'char_delay': 0.008, 'newline_delay': 0.05},
+    'slate': {'char_delay': 0.008, 'newline_delay': 0.05},
+    'tiptap': {'char_delay': 0, 'newline_delay': 0.05},
+}
+
+DETECT_EDITOR_JS = """(() => {
+  const el = document.activeElement;
+  const focused = el && el !== document.body && el.closest;
+  const has = (sel) => focused ? !!el.closest(sel) : !!document.querySelector(sel);
+  if (has('.DraftEditor-root, [data-contents="true"]')) return 'draftjs';
+  if (has('[data-slate-editor]')) return 'slate';
+  if (has('.ProseMirror, .tiptap')) return 'tiptap';
+  return 'fast';
+})()"""
+
+
+async def detect_editor(session) -> str:
+    """Guess the EDITOR_PROFILES key for the focused editor; cached on the session."""
+    if session.editor is None:
+        result = await cdp_send(session, 'Runtime.evaluate', {
+            'expression': DETECT_EDITOR_JS, 'returnByValue': True
+        })
+        editor = result.get('result', {}).get('value')
+        if editor not in EDITOR_PROFILES:
+            editor = 'fast'
+        if editor == 'fast':
+            return editor  # not cached: a hostile editor may mount later
+        session.editor = editor
+    return session.editor
+
+
+# Focus and wait (up to ~100ms) for focus to land, in a single round-trip.
+# A fixed declaration called with the selector as an argument: nothing is
+# interpolated into page source and V8 can reuse the compiled function.
+FOCUS_FN = """async function (sel) {
+  const e = document.querySelector(sel);
+  if (!e) return false;
+  const focused = () => e === document.activeElement || e.contains(document.activeElement);
+  e.focus();
+  for (let i = 0; i < 20 && !focused(); i++) await new Promise(r => setTimeout(r, 5));
+  return focused();
+}"""
+
+
+async def document_object_id(session) -> str:
+    """objectId of the page's document, cached on the session until navigation.
+
+    Gives callFunctionOn a target without Runtime.enable, which hostile sites
+    can detect and which would stream every console message to the reader.
+    """
+    if session.document_object is None:
+        result = await cdp_send(session, 'Runtime.evaluate', {'expression': 'document'})
+        session.document_object = result['result']['objectId']
+    return session.document_object
+
+
+async def focus_selector(session, selector: str):
+    """Focus the element matching selector; raises if it can't take focus."""
+    params = {
+        'functionDeclaration': FOCUS_FN,
+        'arguments': [{'value': selector}],
+        'awaitPromise': True, 'returnByValue': True,
+    }
+    try:
+        result = await cdp_send(session, 'Runtime.callFunctionOn', {
+            'objectId': await document_object_id(session), **params
+        })
+    except RuntimeError:
+        # The cached handle outlived its context (no navigation seen): refetch once
+        session.document_object = None
+        result = await cdp_send(session, 'Runtime.callFunctionOn', {
+            'objectId': await document_object_id(session), **params
+        })
+    if result.get('result', {}).get('value') is not True:
+        raise RuntimeError(f"Could not focus '{selector}'")
+
 
-    async with websockets.connect(ws_url, max_size=100*1024*1024) as ws:
+async def cdp_type(text: str, tab_url: Optional[str] = None,
+                   selector: Optional[str] = None, clear: bool = False,
+                   trusted_keys: bool = False, editor_profile: Optional[str] = None,
+                   target_id: Optional[str] = None):
+    """Type text via CDP. Passes isTrusted checks.
+
+    Plain runs go through a single Input.insertText; newlines, tabs and
+    shifted characters still get raw key events. With trusted_keys, every
+    character is sent as keyDown/char/keyUp (for sites that reject insertText).
+    Key pacing follows editor_profile (see EDITOR_PROFILES), detected from the
+    focused element when not given. target_id (from /tabs or an earlier
+    result) addresses the tab directly instead of matching tab_url.
+    """
+    if editor_profile is not None and editor_profile not in EDITOR_PROFILES:
+        raise ValueError(f"Unknown editor profile '{editor_profile}'. Known: {list(EDITOR_PROFILES)}")
+    session = await POOL.get(tab_url, target_id)
+    print(f"Connected: {session.url}")
+    async with PER_TAB_LOCK[session.target_id]:
         if selector:
-            await cdp_send(ws, 'Runtime.evaluate', {
-                'expression': f'document.querySelector(\'{selector}\').focus()',
-            })
-            await asyncio.sleep(0.1)
+            await focus_selector(session, selector)
 
         if clear:
             # Cmd+A then Backspace
-            await cdp_send(ws, 'Input.dispatchKeyEvent', {
+            await cdp_send(session, 'Input.dispatchKeyEvent', {
                 'type': 'keyDown', 'key': 'a', 'code': 'KeyA',
                 'windowsVirtualKeyCode': 65, 'modifiers': 4  # Meta
             })
-            await cdp_send(ws, 'Input.dispatchKeyEvent', {
+            await cdp_send(session, 'Input.dispatchKeyEvent', {
                 'type': 'keyUp', 'key': 'a', 'code': 'KeyA',
                 'windowsVirtualKeyCode': 65, 'modifiers': 4
             })
             await asyncio.sleep(0.05)
             for et in ['rawKeyDown', 'keyUp']:
-                await cdp_send(ws, 'Input.dispatchKeyEvent', {
+                await cdp_send(session, 'Input.dispatchKeyEvent', {
                     'type': et, 'key': 'Backspace', 'code': 'Backspace',
                     'windowsVirtualKeyCode': 8
                 })
             await asyncio.sleep(0.05)
 
+        # Resolved only once a key event is due: plain insertText runs need no pacing
+        pacing = EDITOR_PROFILES[editor_profile] if editor_profile else None
+
         n = 0
-        for c in text:
-            await dispatch_key(ws, c)
-            n += 1
+        if trusted_keys:
+            pacing = pacing or EDITOR_PROFILES[await detect_editor(session)]
+            for c in text:
+                await dispatch_key(session, c, **pacing)
+                n += 1
+        else:
+            for chunk, is_plain in split_runs(text):
+                if is_plain:
+                    await insert_text(session, chunk)
+                else:
+                    pacing = pacing or EDITOR_PROFILES[await detect_editor(session)]
+                    await dispatch_key(session, chunk, **pacing)
+                n += len(chunk)
 
         print(f"Typed {n} chars")
-        return {"ok": True, "chars": n, "tab": url}
+        return {"ok": True, "chars": n, "tab": session.url, "targetId": session.target_id}
 
 
 # --- CDP DOM operations ---
 
-async def cdp_get_dom(tab_url: Optional[str] = None, depth: int = -1, pierce: bool = True):
-    """Get full DOM tree including Shadow DOM."""
-    ws_url, url = await get_ws_url(tab_url)
-    async with websockets.connect(ws_url, max_size=100*1024*1024) as ws:
-        await cdp_send(ws, 'DOM.enable')
-        result = await cdp_send(ws, 'DOM.getDocument', {
+async def cdp_get_dom(tab_url: Optional[str] = None, depth: int = 2, pierce: bool = True,
+                      node_id: Optional[int] = None, backend_node_id: Optional[int] = None,
+                      fresh: bool = False, target_id: Optional[str] = None):
+    """Get the DOM tree (Shadow DOM pierced), shallow by default.
+
+    Without a node id, returns DOM.getDocument to the given depth, cached on
+    the session until the page navigates or mutates (or fresh=True). Only the
+    most recent tree is kept: every getDocument makes Chrome discard the node
+    ids it handed out before. With node_id (from the latest tree) or
+    backend_node_id from any earlier result, returns that node's subtree via
+    DOM.describeNode. Nodes inside a describeNode result are not registered
+    with the DOM agent (their nodeId is 0), so keep walking by backendNodeId.
+    """
+    session = await POOL.get(tab_url, target_id)
+    async with PER_TAB_LOCK[session.target_id]:
+        await cdp_enable(session, 'DOM')
+        if node_id is not None or backend_node_id is not None:
+            params = {'nodeId': node_id} if node_id is not None else {'backendNodeId': backend_node_id}
+            return await cdp_send(session, 'DOM.describeNode', {
+                **params, 'depth': depth, 'pierce': pierce
+            })
+
+        key = (depth, pierce)
+        if not fresh and key in session.dom_cache:
+            return session.dom_cache[key]
+        result = await cdp_send(session, 'DOM.getDocument', {
             'depth': depth, 'pierce': pierce
         })
+        session.dom_cache.clear()  # the previous tree's node ids are now invalid
+        session.dom_cache[key] = result
         return result
 
 
-async def cdp_get_ax_tree(tab_url: Optional[str] = None):
-    """Get full accessibility tree."""
-    ws_url, url = await get_ws_url(tab_url)
-    async with websockets.connect(ws_url, max_size=100*1024*1024) as ws:
-        await cdp_send(ws, 'Accessibility.enable')
-        result = await cdp_send(ws, 'Accessibility.getFullAXTree')
+async def cdp_get_ax_tree(tab_url: Optional[str] = None, depth: Optional[int] = None,
+                          target_id: Optional[str] = None):
+    """Get the accessibility tree (full, or limited to depth levels).
+
+    Callers only report the node count, and counting needs every node:
+    walking with Accessibility.getChildAXNodes would ship the same nodes
+    plus one round-trip per parent. The full tree stays on the local CDP
+    socket; pass depth to cap the transfer when a bounded count is enough.
+    """
+    session = await POOL.get(tab_url, target_id)
+    async with PER_TAB_LOCK[session.target_id]:
+        await cdp_enable(session, 'Accessibility')
+        params = {'depth': depth} if depth is not None else None
+        result = await cdp_send(session, 'Accessibility.getFullAXTree', params)
         return result
 
 
-async def cdp_evaluate(expression: str, tab_url: Optional[str] = None):
+async def cdp_evaluate(expression: str, tab_url: Optional[str] = None,
+                       target_id: Optional[str] = None):
     """Evaluate JavaScript in page context."""
-    ws_url, url = await get_ws_url(tab_url)
-    async with websockets.connect(ws_url, max_size=100*1024*1024) as ws:
-        result = await cdp_send(ws, 'Runtime.evaluate', {
+    session = await POOL.get(tab_url, target_id)
+    async with PER_TAB_LOCK[session.target_id]:
+        result = await cdp_send(session, 'Runtime.evaluate', {
             'expression': expression, 'returnByValue': True
         })
         return result
 
 
-async def cdp_click(x: int, y: int, tab_url: Optional[str] = None):
+async def cdp_click(x: int, y: int, tab_url: Optional[str] = None,
+                    target_id: Optional[str] = None):
     """Click at coordinates via CDP Input.dispatchMouseEvent."""
-    ws_url, url = await get_ws_url(tab_url)
-    async with websockets.connect(ws_url, max_size=100*1024*1024) as ws:
+    session = await POOL.get(tab_url, target_id)
+    async with PER_TAB_LOCK[session.target_id]:
         for etype in ['mousePressed', 'mouseReleased']:
-            await cdp_send(ws, 'Input.dispatchMouseEvent', {
+            await cdp_send(session, 'Input.dispatchMouseEvent', {
                 'type': etype, 'x': x, 'y': y, 'button': 'left',
                 'clickCount': 1
             })
             await asyncio.sleep(0.02)
-        return {"ok": True, "x": x, "y": y}
+        return {"ok": True, "x": x, "y": y, "targetId": session.target_id}
 
 
 # ============================================================
 # browser-use integration (optional — for AI-powered features)
 # ============================================================
 
-async def browser_use_agent(task: str, tab_url: Optional[str] = None):
-    """Run a browser-use agent task on the current page."""
-    try:
-        from browser_use import Agent, Browser
-    except ImportError:
-        return {"error": "browser-use not installed. Run: pip3 install browser-use"}
+# One Browser (and LLM client) shared by /agent and /find: browser-use's
+# start() does a full CDP handshake and target discovery.
+_BU_BROWSER = None
+_BU_LLM = None
+_BU_LOCK = asyncio.Lock()
+# browser-use's session focus and event bus assume one driver at a time, so
+# agent runs and element lookups on the shared Browser take turns.
+_BU_RUN_LOCK = asyncio.Lock()
 
-    # Try to get an LLM
-    llm = None
+
+def _make_llm():
+    """First LLM client that can be configured from the environment, or None."""
     try:
         from browser_use import ChatBrowserUse
-        llm = ChatBrowserUse()
+        return ChatBrowserUse()
     except Exception:
         try:
             from browser_use.llm.openai.chat import ChatOpenAI
-            llm = ChatOpenAI()
+            return ChatOpenAI()
         except Exception:
-            pass
+            return None
+
+
+async def _get_llm():
+    global _BU_LLM
+    async with _BU_LOCK:
+        if _BU_LLM is None:
+            _BU_LLM = _make_llm()
+        return _BU_LLM
+
+
+async def _get_browser():
+    """Shared browser-use Browser attached to CDP_BASE, started on first use."""
+    global _BU_BROWSER
+    from browser_use import Browser
+    async with _BU_LOCK:
+        if _BU_BROWSER is None:
+            browser = Browser(cdp_url=CDP_BASE, keep_alive=True)
+            await browser.start()
+            _BU_BROWSER = browser
+        return _BU_BROWSER
+
+
+async def browser_use_reset():
+    """Drop the shared Browser and LLM (e.g. after credentials change).
+
+    Refused while background agent jobs are using the Browser; waits for
+    any other run in progress.
+    """
+    global _BU_BROWSER, _BU_LLM
+    if _AGENT_TASKS:
+        return {"error": f"{len(_AGENT_TASKS)} agent job(s) still running; retry once they finish"}
+    async with _BU_RUN_LOCK:
+        async with _BU_LOCK:
+            browser, _BU_BROWSER, _BU_LLM = _BU_BROWSER, None, None
+        if browser is not None:
+            try:
+                await browser.stop()
+            except Exception:
+                pass
+    return {"ok": True}
 
+
+async def browser_use_agent(task: str, tab_url: Optional[str] = None):
+    """Run a browser-use agent task on the current page."""
+    try:
+        from browser_use import Agent
+    except ImportError:
+        return {"error": "browser-use not installed. Run: pip3 install browser-use"}
+
+    llm = await _get_llm()
     if not llm:
         return {"error": "No LLM configured. Set BROWSER_USE_API_KEY, OPENAI_API_KEY, or ANTHROPIC_API_KEY"}
 
-    browser = Browser(cdp_url=CDP_BASE)
-    agent = Agent(task=task, llm=llm, browser=browser)
-    history = await agent.run(max_steps=20)
+    async with _BU_RUN_LOCK:
+        browser = await _get_browser()
+        agent = Agent(task=task, llm=llm, browser=browser)
+        history = await agent.run(max_steps=20)
 
     return {
         "ok": True,
@@ -268,109 +832,278 @@ async def browser_use_agent(task: str, tab_url: Optional[str] = None):
 async def browser_use_find_element(prompt: str, tab_url: Optional[str] = None):
     """Find an element using AI (browser-use's get_element_by_prompt)."""
     try:
-        from browser_use import Browser
+        import browser_use  # noqa: F401
     except ImportError:
         return {"error": "browser-use not installed"}
 
-    try:
-        from browser_use import ChatBrowserUse
-        llm = ChatBrowserUse()
-    except Exception:
-        try:
-            from browser_use.llm.openai.chat import ChatOpenAI
-            llm = ChatOpenAI()
-        except Exception:
-            return {"error": "No LLM configured"}
+    llm = await _get_llm()
+    if not llm:
+        return {"error": "No LLM configured"}
 
-    browser = Browser(cdp_url=CDP_BASE)
-    await browser.start()
-    page = await browser.get_current_page()
-    element = await page.get_element_by_prompt(prompt, llm=llm)
+    async with _BU_RUN_LOCK:
+        browser = await _get_browser()
+        page = await browser.get_current_page()
+        element = await page.get_element_by_prompt(prompt, llm=llm)
 
-    if element:
-        info = await element.get_basic_info()
-        bbox = await element.get_bounding_box()
-        return {"ok": True, "found": True, "info": str(info), "bbox": str(bbox)}
-    else:
-        return {"ok": True, "found": False}
+        if element:
+            info = await element.get_basic_info()
+            bbox = await element.get_bounding_box()
+            return {"ok": True, "found": True, "info": str(info), "bbox": str(bbox)}
+        else:
+            return {"ok": True, "found": False}
 
 
 # ============================================================
 # HTTP Server
 # ============================================================
 
-async def handle_request(reader, writer):
-    """HTTP request handler."""
-    request = await reader.read(65536)
-    request_str = request.decode()
-    lines = request_str.split('\r\n')
-    parts = lines[0].split(' ', 2)
-    method = parts[0] if len(parts) > 0 else 'GET'
-    path = parts[1] if len(parts) > 1 else '/'
-
-    body = {}
-    if method == 'POST' and '\r\n\r\n' in request_str:
-        body_str = request_str.split('\r\n\r\n', 1)[1]
-        try:
-            body = json.loads(body_str)
-        except json.JSONDecodeError:
-            body = {}
+MAX_CONCURRENT_REQUESTS = 32
+GLOBAL_SEM = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+REQUEST_TIMEOUT = 30.0  # per HTTP request; agent runs are background jobs instead
+IDLE_TIMEOUT = 15.0  # keep-alive connections with no new request are closed after this
+MAX_BODY_SIZE = 4 * 1024 * 1024  # request bodies are small JSON; anything larger gets a 413
+AGENT_TIMEOUT = 300.0  # includes waiting for the shared Browser behind other runs
+MAX_AGENT_JOBS = 100  # finished jobs kept for /agent/status polling
+MAX_RUNNING_AGENT_JOBS = 4  # running or queued; runs take turns on the shared Browser
+
+AGENT_JOBS: dict[str, dict] = {}
+_AGENT_TASKS: dict[str, asyncio.Task] = {}
+
 
+async def _run_agent_job(job_id: str, task: str, tab_url: Optional[str]):
+    job = AGENT_JOBS[job_id]
+    try:
+        async with asyncio.timeout(AGENT_TIMEOUT):
+            result = await browser_use_agent(task, tab_url)
+        if "error" in result:
+            # browser_use_agent reports setup failures (not installed, no LLM) by value
+            job["status"] = "error"
+            job["error"] = result["error"]
+        else:
+            job["status"] = "done"
+            job["result"] = result
+    except TimeoutError:
+        job["status"] = "error"
+        job["error"] = f"Agent timed out after {AGENT_TIMEOUT:.0f}s"
+    except asyncio.CancelledError:
+        job["status"] = "cancelled"
+        job["error"] = "Agent cancelled (server shutting down)"
+        raise
+    except Exception as e:
+        job["status"] = "error"
+        job["error"] = str(e)
+    finally:
+        job["finished"] = time.time()
+        _AGENT_TASKS.pop(job_id, None)
+
+
+def start_agent_job(task: str, tab_url: Optional[str] = None) -> dict:
+    """Start a browser-use agent run in the background; poll /agent/status/<jobId>."""
+    if len(_AGENT_TASKS) >= MAX_RUNNING_AGENT_JOBS:
+        return {"error": f"{len(_AGENT_TASKS)} agent jobs already running or queued; retry later"}
+
+    finished = [k for k, j in AGENT_JOBS.items() if j["status"] != "running"]
+    for k in finished[:max(0, len(AGENT_JOBS) - MAX_AGENT_JOBS + 1)]:
+        del AGENT_JOBS[k]
+
+    job_id = uuid.uuid4().hex[:12]
+    AGENT_JOBS[job_id] = {"status": "running", "task": task, "started": time.time()}
+    _AGENT_TASKS[job_id] = asyncio.create_task(_run_agent_job(job_id, task, tab_url))
+    return {"ok": True, "jobId": job_id, "status": "running"}
+
+
+async def cancel_agent_jobs():
+    """Cancel running agent jobs and wait for them to unwind (on shutdown)."""
+    tasks = list(_AGENT_TASKS.values())
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class PayloadTooLarge(ValueError):
+    """Request body over MAX_BODY_SIZE."""
+
+
+async def read_chunked(reader) -> bytes:
+    """Read a Transfer-Encoding: chunked body."""
+    chunks = []
+    total = 0
+    while True:
+        size_line = await reader.readuntil(b'\r\n')
+        size = int(size_line.split(b';', 1)[0], 16)
+        total += size
+        if total > MAX_BODY_SIZE:
+            raise PayloadTooLarge(f"Chunked body exceeds {MAX_BODY_SIZE} bytes")
+        if size == 0:
+            while await reader.readuntil(b'\r\n') != b'\r\n':
+                pass  # discard trailers
+            return b''.join(chunks)
+        chunks.append(await reader.readexactly(size))
+        await reader.readexactly(2)
+
+
+async def read_request(reader, writer):
+    """Read one request off a keep-alive connection.
+
+    Returns (method, path, version, headers, body), or None once the client
+    has closed the connection or stalled for IDLE_TIMEOUT seconds (waiting
+    for headers, or mid-body). Header names (lowercased) and values are bytes.
+    Raises PayloadTooLarge for a body over MAX_BODY_SIZE.
+    """
+    try:
+        async with asyncio.timeout(IDLE_TIMEOUT):
+            head = await reader.readuntil(b'\r\n\r\n')
+    except (asyncio.IncompleteReadError, TimeoutError):
+        return None
+
+    # Parse on bytes; only the request line fields are decoded
+    request_line, *header_lines = head[:-4].split(b'\r\n')
+    parts = request_line.split(b' ', 2)
+    method = parts[0].decode('ascii') if len(parts) > 0 else 'GET'
+    path = parts[1].decode('ascii') if len(parts) > 1 else '/'
+    version = parts[2].decode('ascii') if len(parts) > 2 else 'HTTP/1.0'
+    headers = {}
+    for line in header_lines:
+        k, sep, v = line.partition(b':')
+        if sep:
+            headers[k.strip().lower()] = v.strip()
+
+    chunked = headers.get(b'transfer-encoding', b'').lower() == b'chunked'
+    length = 0 if chunked else int(headers.get(b'content-length', 0))
+    if length > MAX_BODY_SIZE:
+        raise PayloadTooLarge(f"Content-Length {length} exceeds {MAX_BODY_SIZE} bytes")
+
+    if headers.get(b'expect', b'').lower() == b'100-continue':
+        writer.write(b'HTTP/1.1 100 Continue\r\n\r\n')
+        await writer.drain()
+    try:
+        async with asyncio.timeout(IDLE_TIMEOUT):
+            body = await read_chunked(reader) if chunked else await reader.readexactly(length)
+    except TimeoutError:
+        return None
+    return method, path, version, headers, body
+
+
+async def handle_http(method: str, path: str, body: dict) -> dict:
+    """Route one request to a bridge operation."""
     try:
         if path == '/health':
             result = {"ok": True, "cdp": CDP_BASE}
 
         elif path == '/tabs':
             targets = await get_targets()
-            pages = [{"title": t.get("title", ""), "url": t.get("url", "")}
+            pages = [{"title": t.get("title", ""), "url": t.get("url", ""), "targetId": t.get("id")}
                      for t in targets if t.get("type") == "page"]
             result = {"ok": True, "tabs": pages}
 
         elif path == '/type' and method == 'POST':
             text = body.get('text', '').replace('\\n', '\n')
-            r = await cdp_type(text, body.get('tabUrl'), body.get('selector'), body.get('clear', False))
+            r = await cdp_type(text, body.get('tabUrl'), body.get('selector'), body.get('clear', False),
+                               body.get('trustedKeys', False), body.get('editorProfile'),
+                               target_id=body.get('targetId'))
             result = r
 
         elif path == '/click' and method == 'POST':
-            r = await cdp_click(body['x'], body['y'], body.get('tabUrl'))
+            r = await cdp_click(body['x'], body['y'], body.get('tabUrl'), target_id=body.get('targetId'))
             result = r
 
         elif path == '/eval' and method == 'POST':
-            r = await cdp_evaluate(body['expression'], body.get('tabUrl'))
+            r = await cdp_evaluate(body['expression'], body.get('tabUrl'), target_id=body.get('targetId'))
             result = {"ok": True, "result": r}
 
         elif path == '/dom':
-            r = await cdp_get_dom(body.get('tabUrl') if method == 'POST' else None)
-            result = {"ok": True, "dom": "truncated (use CLI for full output)"}
+            r = await cdp_get_dom(body.get('tabUrl'), body.get('depth', 2), node_id=body.get('nodeId'),
+                                  backend_node_id=body.get('backendNodeId'),
+                                  fresh=body.get('fresh', False), target_id=body.get('targetId'))
+            result = {"ok": True, "dom": r}
 
         elif path == '/axtree':
-            r = await cdp_get_ax_tree(body.get('tabUrl') if method == 'POST' else None)
+            r = await cdp_get_ax_tree(body.get('tabUrl'), body.get('depth'), target_id=body.get('targetId'))
             result = {"ok": True, "nodes": len(r.get("nodes", []))}
 
         elif path == '/agent' and method == 'POST':
-            r = await browser_use_agent(body['task'], body.get('tabUrl'))
-            result = r
+            result = start_agent_job(body['task'], body.get('tabUrl'))
+
+        elif path.startswith('/agent/status/'):
+            job_id = path[len('/agent/status/'):]
+            job = AGENT_JOBS.get(job_id)
+            if job is None:
+                result = {"error": f"Unknown agent job '{job_id}'"}
+            else:
+                result = {"ok": True, "jobId": job_id, **job}
 
         elif path == '/find' and method == 'POST':
             r = await browser_use_find_element(body['prompt'], body.get('tabUrl'))
             result = r
 
+        elif path == '/bu/reset' and method == 'POST':
+            result = await browser_use_reset()
+
         else:
             result = {"error": f"Unknown: {method} {path}",
                       "endpoints": ["/health", "/tabs", "/type", "/click", "/eval",
-                                    "/dom", "/axtree", "/agent", "/find"]}
+                                    "/dom", "/axtree", "/agent", "/agent/status/<jobId>",
+                                    "/find", "/bu/reset"]}
 
     except Exception as e:
         result = {"error": str(e)}
 
-    body_str = json.dumps(result, default=str)
-    response = (f"HTTP/1.1 200 OK\r\n"
-                f"Content-Type: application/json\r\n"
-                f"Content-Length: {len(body_str)}\r\n"
-                f"Access-Control-Allow-Origin: *\r\n\r\n{body_str}")
-    writer.write(response.encode())
-    await writer.drain()
-    writer.close()
+    return result
+
+
+def write_response(writer, result: dict, status: bytes = b'200 OK', keep_alive: bool = True):
+    payload = json_dumps(result)
+    head = (b"HTTP/1.1 %s\r\n"
+            b"Content-Type: application/json\r\n"
+            b"Content-Length: %d\r\n"
+            b"Access-Control-Allow-Origin: *\r\n"
+            b"Connection: %s\r\n\r\n") % (status, len(payload), b'keep-alive' if keep_alive else b'close')
+    writer.writelines((head, payload))
+
+
+async def handle_request(reader, writer):
+    """HTTP/1.1 connection handler: serves requests in order until the client closes."""
+    try:
+        while True:
+            try:
+                request = await read_request(reader, writer)
+            except PayloadTooLarge as e:
+                write_response(writer, {"error": str(e)}, b'413 Payload Too Large', keep_alive=False)
+                await writer.drain()
+                break
+            except (asyncio.LimitOverrunError, asyncio.IncompleteReadError, ValueError) as e:
+                write_response(writer, {"error": f"Bad request: {e}"}, b'400 Bad Request', keep_alive=False)
+                await writer.drain()
+                break
+            if request is None:
+                break
+            method, path, version, headers, raw_body = request
+
+            body = {}
+            if method == 'POST' and raw_body:
+                try:
+                    body = json_loads(raw_body)
+                except ValueError:
+                    body = {}
+
+            async with GLOBAL_SEM:
+                try:
+                    async with asyncio.timeout(REQUEST_TIMEOUT):
+                        result = await handle_http(method, path, body)
+                except TimeoutError:
+                    result = {"error": f"Timed out after {REQUEST_TIMEOUT:.0f}s: {method} {path}"}
+
+            connection = headers.get(b'connection', b'').lower()
+            keep_alive = connection == b'keep-alive' if version == 'HTTP/1.0' else connection != b'close'
+            write_response(writer, result, keep_alive=keep_alive)
+            await writer.drain()
+            if not keep_alive:
+                break
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
 
 
 async def serve(port: int = 18850):
@@ -382,20 +1115,37 @@ async def serve(port: int = 18850):
     print(f"   POST /type    — raw CDP keyboard input")
     print(f"   POST /click   — CDP mouse click (x, y)")
     print(f"   POST /eval    — evaluate JavaScript")
-    print(f"   GET  /dom     — full DOM tree (Shadow DOM pierced)")
-    print(f"   GET  /axtree  — full accessibility tree")
+    print(f"   GET  /dom     — DOM tree, Shadow DOM pierced (POST backendNodeId/depth to expand)")
+    print(f"   GET  /axtree  — accessibility tree node count")
     print(f"   GET  /tabs    — list browser tabs")
     print(f"\n   AI (browser-use):")
-    print(f"   POST /agent   — run browser-use agent task")
+    print(f"   POST /agent   — start browser-use agent task (returns jobId)")
+    print(f"   GET  /agent/status/<jobId> — poll an agent task")
     print(f"   POST /find    — AI element finding")
+    print(f"   POST /bu/reset — drop the shared browser-use session (e.g. new API keys)")
     async with server:
-        await server.serve_forever()
+        try:
+            await server.serve_forever()
+        finally:
+            await shutdown()
 
 
 # ============================================================
 # CLI
 # ============================================================
 
+def run(coro):
+    """Run a CLI coroutine (on uvloop when installed), then close shared connections."""
+    async def _main():
+        try:
+            return await coro
+        finally:
+            await shutdown()
+    if uvloop is not None:
+        return uvloop.run(_main())
+    return asyncio.run(_main())
+
+
 def main():
     parser = argparse.ArgumentParser(description='OpenClaw CDP Bridge')
     sub = parser.add_subparsers(dest='command')
@@ -404,27 +1154,41 @@ def main():
     p = sub.add_parser('type', help='Type text via raw CDP events')
     p.add_argument('--text', '-t', required=True)
     p.add_argument('--tab-url', '-u')
+    p.add_argument('--target-id', help='CDP target id (from tabs); skips tab URL lookup')
     p.add_argument('--selector', '-s')
     p.add_argument('--clear', '-c', action='store_true')
+    p.add_argument('--trusted-keys', action='store_true',
+                   help='Send every character as raw key events instead of Input.insertText')
+    p.add_argument('--editor', choices=list(EDITOR_PROFILES),
+                   help='Key pacing profile (default: detect from the focused element)')
 
     # click
     p = sub.add_parser('click', help='Click at coordinates')
     p.add_argument('--x', type=int, required=True)
     p.add_argument('--y', type=int, required=True)
     p.add_argument('--tab-url', '-u')
+    p.add_argument('--target-id', help='CDP target id (from tabs); skips tab URL lookup')
 
     # eval
     p = sub.add_parser('eval', help='Evaluate JavaScript')
     p.add_argument('--expr', '-e', required=True)
     p.add_argument('--tab-url', '-u')
+    p.add_argument('--target-id', help='CDP target id (from tabs); skips tab URL lookup')
 
     # dom
     p = sub.add_parser('dom', help='Get DOM tree (pierces Shadow DOM)')
     p.add_argument('--tab-url', '-u')
+    p.add_argument('--target-id', help='CDP target id (from tabs); skips tab URL lookup')
+    p.add_argument('--depth', '-d', type=int, default=2, help='Levels to fetch (-1 for the whole tree)')
+    p.add_argument('--node-id', '-n', type=int, help='Fetch the subtree under this node instead')
+    p.add_argument('--backend-node-id', '-b', type=int,
+                   help='Same, by backendNodeId (works for nodes from an expanded subtree too)')
 
     # axtree
     p = sub.add_parser('axtree', help='Get accessibility tree')
     p.add_argument('--tab-url', '-u')
+    p.add_argument('--target-id', help='CDP target id (from tabs); skips tab URL lookup')
+    p.add_argument('--depth', '-d', type=int, help='Limit tree depth (default: full tree)')
 
     # agent
     p = sub.add_parser('agent', help='Run browser-use agent task')
@@ -446,28 +1210,30 @@ def main():
     args = parser.parse_args()
 
     if args.command == 'type':
-        asyncio.run(cdp_type(args.text.replace('\\n', '\n'), args.tab_url, args.selector, args.clear))
+        run(cdp_type(args.text.replace('\\n', '\n'), args.tab_url, args.selector, args.clear,
+                     args.trusted_keys, args.editor, target_id=args.target_id))
     elif args.command == 'click':
-        asyncio.run(cdp_click(args.x, args.y, args.tab_url))
+        run(cdp_click(args.x, args.y, args.tab_url, target_id=args.target_id))
     elif args.command == 'eval':
-        r = asyncio.run(cdp_evaluate(args.expr, args.tab_url))
-        print(json.dumps(r, indent=2))
+        r = run(cdp_evaluate(args.expr, args.tab_url, target_id=args.target_id))
+        print(json_dumps(r, indent=True).decode())
     elif args.command == 'dom':
-        r = asyncio.run(cdp_get_dom(args.tab_url))
-        print(json.dumps(r, indent=2, default=str)[:5000])
+        r = run(cdp_get_dom(args.tab_url, args.depth, node_id=args.node_id,
+                            backend_node_id=args.backend_node_id, target_id=args.target_id))
+        print(json_dumps(r, indent=True).decode()[:5000])
     elif args.command == 'axtree':
-        r = asyncio.run(cdp_get_ax_tree(args.tab_url))
+        r = run(cdp_get_ax_tree(args.tab_url, args.depth, target_id=args.target_id))
         print(f"Accessibility tree: {len(r.get('nodes', []))} nodes")
     elif args.command == 'agent':
-        r = asyncio.run(browser_use_agent(args.task, args.tab_url))
-        print(json.dumps(r, indent=2, default=str))
+        r = run(browser_use_agent(args.task, args.tab_url))
+        print(json_dumps(r, indent=True).decode())
     elif args.command == 'find':
-        r = asyncio.run(browser_use_find_element(args.prompt, args.tab_url))
-        print(json.dumps(r, indent=2))
+        r = run(browser_use_find_element(args.prompt, args.tab_url))
+        print(json_dumps(r, indent=True).decode())
     elif args.command == 'tabs':
-        asyncio.run(list_tabs())
+        run(list_tabs())
     elif args.command == 'serve':
-        asyncio.run(serve(args.port))
+        run(serve(args.port))
     else:
         parser.print_help()
 
@@ -478,6 +1244,7 @@ async def list_tabs():
     for p in pages:
         print(f"  {p.get('title', 'untitled')[:60]}")
         print(f"    {p.get('url')}")
+        print(f"    id: {p.get('id')}")
         print()
 
 
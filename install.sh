@@ -24,6 +24,10 @@ fi
 echo "  Installing core deps (httpx, websockets)..."
 pip3 install -q httpx websockets 2>/dev/null || python3 -m pip install -q httpx websockets
 
+# Optional speedups: orjson (faster JSON), uvloop (faster event loop, not on Windows)
+pip3 install -q orjson 2>/dev/null || python3 -m pip install -q orjson 2>/dev/null || echo "  (orjson unavailable — using stdlib json)"
+pip3 install -q uvloop 2>/dev/null || python3 -m pip install -q uvloop 2>/dev/null || echo "  (uvloop unavailable — using default asyncio loop)"
+
 # Optional: browser-use for AI features
 read -p "  Install browser-use for AI features? (y/N) " -n 1 -r
 echo